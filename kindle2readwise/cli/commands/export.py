@@ -4,7 +4,7 @@ import logging
 import sys
 from pathlib import Path
 
-from ...config import get_config_value
+from ...config import get_config_value, get_token_cache_path
 from ...core import Kindle2Readwise
 from ...database import DEFAULT_DB_PATH
 from ...exceptions import ProcessingError, ValidationError
@@ -54,6 +54,7 @@ def handle_export(args):
     clippings_file = _get_export_clippings_file(args)
     db_path = _get_export_db_path(args)
     _check_export_options(args)
+    dry_run = args.dry_run or args.fast_dry_run
 
     # Check if file exists
     if not clippings_file.exists():
@@ -66,11 +67,13 @@ def handle_export(args):
             clippings_file=str(clippings_file),
             readwise_token=readwise_token,
             db_path=db_path,
-            dry_run=args.dry_run,
+            dry_run=dry_run,
+            skip_dedup_check=args.fast_dry_run,
+            token_cache_path=get_token_cache_path(),
         )
 
         try:
-            app.validate_setup()
+            app.validate_setup(force_validate=args.force_validate)
 
             # Initialize stats to None
             stats = None
@@ -82,7 +85,7 @@ def handle_export(args):
                 # Regular export mode
                 logger.info("Setup valid. Starting export process...")
                 stats = app.process()
-                print(format_export_summary(stats, clippings_file, args.dry_run))
+                print(format_export_summary(stats, clippings_file, dry_run))
 
             # Set exit code based on failed sends - only if stats is populated
             if stats is not None and stats.failed_to_send > 0:
@@ -38,6 +38,9 @@ def handle_reset_db(args):
         except Exception as e:
             logger.error("Error getting database statistics: %s", e, exc_info=True)
             stats = {"sessions": "?", "highlights": "?"}
+        finally:
+            # Release the connection so no WAL file outlives the database file
+            dao.close()
 
         # Show warning with confirmation prompt
         print("\n" + "=" * 80)
@@ -66,8 +69,17 @@ def handle_reset_db(args):
         db_path.unlink()
         logger.info("Successfully deleted database at %s", db_path)
 
+        # Delete leftover WAL files so they are not applied to the new database
+        for sidecar in (
+            db_path.with_name(f"{db_path.name}-wal"),
+            db_path.with_name(f"{db_path.name}-shm"),
+        ):
+            if sidecar.exists():
+                sidecar.unlink()
+                logger.debug("Deleted database sidecar file %s", sidecar)
+
         # Create a fresh, empty database
-        HighlightsDAO(db_path)
+        HighlightsDAO(db_path).close()
 
         print("\nDatabase reset successfully. All history and tracking data has been removed.")
     except Exception as e:
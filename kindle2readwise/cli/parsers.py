@@ -70,6 +70,16 @@ def _setup_export_command(subparsers):
     parser_export.add_argument(
         "--dry-run", "-d", action="store_true", help="Simulate export without sending to Readwise."
     )
+    parser_export.add_argument(
+        "--fast-dry-run",
+        action="store_true",
+        help="Preview the export without checking for duplicates or opening the database (implies --dry-run).",
+    )
+    parser_export.add_argument(
+        "--force-validate",
+        action="store_true",
+        help="Validate the API token with Readwise even if it was validated within the last hour.",
+    )
     parser_export.add_argument("--output", "-o", type=str, help="Output highlights to a file instead of Readwise.")
     parser_export.add_argument("--devices", action="store_true", help="List detected Kindle devices and exit.")
     parser_export.add_argument(
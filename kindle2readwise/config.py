@@ -50,6 +50,29 @@ def get_data_dir() -> Path:
     return data_dir
 
 
+def get_cache_dir() -> Path:
+    """Get the platform-specific cache directory.
+
+    The directory is not created here; callers writing into it create it lazily.
+    """
+    system = platform.system()
+    home = Path.home()
+
+    if system == "Darwin":  # macOS
+        cache_dir = home / "Library" / "Caches" / "kindle2readwise"
+    elif system == "Windows":
+        cache_dir = Path(os.getenv("LOCALAPPDATA", str(home / "AppData" / "Local"))) / "kindle2readwise" / "Cache"
+    else:  # Linux and others
+        cache_dir = Path(os.getenv("XDG_CACHE_HOME") or str(home / ".cache")) / "kindle2readwise"
+
+    return cache_dir
+
+
+def get_token_cache_path() -> Path:
+    """Get the path to the file caching the last successful API token validation."""
+    return get_cache_dir() / "token.json"
+
+
 def get_credentials_dir() -> Path:
     """Get the directory for storing credentials."""
     config_dir = get_config_dir()
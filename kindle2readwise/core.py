@@ -1,7 +1,10 @@
 """Core functionality for kindle2readwise application."""
 
 import logging
-from datetime import datetime
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from itertools import batched
 from pathlib import Path
 
 # Use TYPE_CHECKING to avoid circular imports for type hints if models grow complex
@@ -18,23 +21,60 @@ logger = logging.getLogger(__name__)
 class Kindle2Readwise:
     """Main application class for kindle2readwise."""
 
-    def __init__(self, clippings_file: str, readwise_token: str, db_path: Path | None = None, dry_run: bool = False):
-        """Initialize the application."""
+    # Number of clippings checked against the database per bulk lookup
+    DUPLICATE_CHECK_BATCH_SIZE = 500
+    # Number of new clippings handed to the Readwise client at once (one round of concurrent batches)
+    EXPORT_CHUNK_SIZE = ReadwiseAPIClient.MAX_BATCH_SIZE * ReadwiseAPIClient.MAX_CONCURRENT_REQUESTS
+
+    def __init__(  # noqa: PLR0913
+        self,
+        clippings_file: str,
+        readwise_token: str,
+        db_path: Path | None = None,
+        dry_run: bool = False,
+        *,
+        skip_dedup_check: bool = False,
+        token_cache_path: Path | None = None,
+    ):
+        """Initialize the application.
+
+        Args:
+            clippings_file: Path to the Kindle clippings file
+            readwise_token: Readwise API token
+            db_path: Path to the SQLite database (default: DEFAULT_DB_PATH)
+            dry_run: Simulate the export without sending anything to Readwise
+            skip_dedup_check: In dry-run mode, count every clipping as new without hashing it or
+                opening the database. Ignored for real exports, which always check for duplicates.
+            token_cache_path: File remembering recent successful token validations across runs
+                (see ReadwiseAPIClient.validate_token). Validations are not cached when omitted.
+        """
         self.clippings_file = Path(clippings_file)
         # Use default DB path if none provided
         self.db_path = db_path if db_path else DEFAULT_DB_PATH
-        logger.info("Using database at: %s", self.db_path)
         self.dry_run = dry_run
+        if skip_dedup_check and not dry_run:
+            logger.warning("Ignoring skip_dedup_check: duplicates are always checked outside dry-run mode.")
+        self.skip_dedup_check = skip_dedup_check and dry_run
 
         # Initialize components
         self.parser = KindleClippingsParser(clippings_file)
-        self.readwise_client = ReadwiseAPIClient(readwise_token)
-        self.db = HighlightsDAO(self.db_path)  # Pass the Path object
+        self.readwise_client = ReadwiseAPIClient(readwise_token, token_cache_path=token_cache_path)
+        self.db: HighlightsDAO | None = None
+        if self.skip_dedup_check:
+            logger.info("Duplicate check disabled; the database will not be opened.")
+        else:
+            logger.info("Using database at: %s", self.db_path)
+            self.db = HighlightsDAO(self.db_path)  # Pass the Path object
+        # Parsed clippings together with the (path, mtime_ns, size) of the file they were parsed from
+        self._parsed_cache: tuple[tuple[str, int, int], list[KindleClipping]] | None = None
         logger.info("Kindle2Readwise initialized. Dry run mode: %s", self.dry_run)
 
-    def validate_setup(self) -> None:
+    def validate_setup(self, force_validate: bool = False) -> None:
         """Validate the application setup (file existence, API token).
 
+        Args:
+            force_validate: Validate the API token with Readwise even if it was validated recently.
+
         Raises:
             ValidationError: If the setup validation fails.
         """
@@ -52,7 +92,7 @@ class Kindle2Readwise:
             return
 
         # Validate Readwise API token
-        if not self.readwise_client.validate_token():
+        if not self.readwise_client.validate_token(force=force_validate):
             msg = "Invalid Readwise API token."
             logger.error(msg)
             raise ValidationError(msg)
@@ -72,7 +112,7 @@ class Kindle2Readwise:
         logger.info("Starting processing for clippings file: %s", self.clippings_file)
         if self.dry_run:
             logger.info("DRY RUN MODE: No highlights will be sent to Readwise.")
-        start_time = datetime.now()
+        start_time = time.perf_counter()
 
         # Start export session tracking in the database - only if not in dry-run mode
         session_id = None
@@ -81,18 +121,19 @@ class Kindle2Readwise:
 
         stats = ExportStats()
         session_status = "success"  # Assume success initially
-        status_ref = [session_status]  # Use a list to reference the status
-        all_clippings = []
 
         try:
-            # Parse and filter clippings
-            all_clippings = self.parser.parse()
-            stats.total_processed = len(all_clippings)
-            logger.info("Parsed %d total clippings.", stats.total_processed)
-
-            # Process clippings and update stats
-            self._process_clippings(all_clippings, stats, status_ref)
-            session_status = status_ref[0]  # Get updated status after processing
+            if not self.skip_dedup_check and self._source_unchanged():
+                # Everything in the file was already handled by the last successful export
+                logger.info("Clippings file and database unchanged since last successful export; nothing new.")
+                for clipping in self.parser.iter_parse():
+                    stats.total_processed += 1
+                    # Same rule as _filter_duplicates: clippings without content are not duplicates
+                    if clipping.content:
+                        stats.duplicates_skipped += 1
+            else:
+                # Stream clippings from the parser through the duplicate filter into the export
+                session_status = self._process_clippings(self.parser.iter_parse(), stats)
 
             if stats.failed_to_send > 0:
                 error_msg = f"Failed to send {stats.failed_to_send} highlights to Readwise."
@@ -101,9 +142,8 @@ class Kindle2Readwise:
         except Exception as e:
             logger.error("An error occurred during processing.", exc_info=True)
             session_status = "error"
-            # Ensure stats reflect the failure state if possible
-            stats.failed_to_send = len(all_clippings) if all_clippings else stats.total_processed
-            stats.new_sent = 0
+            # Chunks exported before the failure stay counted as sent; the rest of what was read failed
+            stats.failed_to_send = stats.total_processed - stats.new_sent - stats.duplicates_skipped
             # Wrap the exception in a ProcessingError
             raise ProcessingError(f"Processing failed: {e!s}") from e
         finally:
@@ -111,69 +151,76 @@ class Kindle2Readwise:
 
         return stats
 
-    def _process_clippings(
-        self, all_clippings: list[KindleClipping], stats: ExportStats, status_ref: list[str]
-    ) -> None:
-        """Process filtered clippings and update the stats."""
+    def _process_clippings(self, all_clippings: Iterable[KindleClipping], stats: ExportStats) -> str:
+        """Process clippings, update the stats as they stream through and return the session status."""
+        if self.skip_dedup_check:
+            # Preview only: every parsed clipping counts as new, without hashing or database lookups
+            stats.total_processed = sum(1 for _ in all_clippings)
+            stats.duplicates_skipped = 0
+            stats.new_sent = stats.total_processed
+            logger.info(
+                "DRY RUN: Would have sent up to %d clippings to Readwise (duplicate check skipped).",
+                stats.new_sent,
+            )
+            return "success"
+
         # Filter out duplicates using the database
-        new_clippings, duplicate_count = self._filter_duplicates(all_clippings)
-        stats.duplicates_skipped = duplicate_count
-        stats.new_sent = len(new_clippings)  # Initialize with the count after filtering
-        logger.info(
-            "Found %d new clippings after checking %d duplicates.",
-            len(new_clippings),
-            stats.duplicates_skipped,
-        )
+        new_clippings = self._filter_duplicates(all_clippings, stats)
 
-        # Export new clippings to Readwise if any exist
-        if new_clippings:
-            if self.dry_run:
-                self._handle_dry_run_export(new_clippings, stats)
-            else:
-                self._handle_real_export(new_clippings, stats, status_ref)
+        # Export new clippings to Readwise
+        session_status = "success"
+        if self.dry_run:
+            self._handle_dry_run_export(new_clippings, stats)
         else:
+            session_status = self._handle_real_export(new_clippings, stats)
+
+        logger.info(
+            "Parsed %d total clippings, skipped %d duplicates.", stats.total_processed, stats.duplicates_skipped
+        )
+        if stats.new_sent == 0 and stats.failed_to_send == 0:
             logger.info("No new clippings to export.")
-            stats.new_sent = 0
+        return session_status
 
-    def _handle_dry_run_export(self, new_clippings: list[KindleClipping], stats: ExportStats) -> None:
+    def _handle_dry_run_export(self, new_clippings: Iterable[KindleClipping], stats: ExportStats) -> None:
         """Handle export in dry run mode."""
+        # In dry run mode, we assume all highlights would have been sent successfully
+        stats.new_sent = sum(1 for _ in new_clippings)
+        stats.failed_to_send = 0
         logger.info(
             "DRY RUN: Would have sent %d new clippings to Readwise. Skipping actual API call.",
-            len(new_clippings),
+            stats.new_sent,
         )
-        # In dry run mode, we assume all highlights would have been sent successfully
-        stats.new_sent = len(new_clippings)
-        stats.failed_to_send = 0
 
-    def _handle_real_export(
-        self, new_clippings: list[KindleClipping], stats: ExportStats, status_ref: list[str]
-    ) -> None:
-        """Handle real export to Readwise."""
-        logger.info("Attempting to export %d new clippings to Readwise...", len(new_clippings))
-        export_result = self.readwise_client.send_highlights(new_clippings)
-        # Update based on what was actually sent
-        sent_count = export_result.get("sent", 0)
-        stats.new_sent = sent_count  # This will be the actual number successfully sent
-        stats.failed_to_send = export_result.get("failed", 0)
-        logger.info("Readwise export result: Sent=%d, Failed=%d", stats.new_sent, stats.failed_to_send)
+    def _handle_real_export(self, new_clippings: Iterable[KindleClipping], stats: ExportStats) -> str:
+        """Handle real export to Readwise, sending and saving new clippings chunk by chunk.
+
+        Returns:
+            The session status: "partial" if any highlight failed to send, "success" otherwise.
+        """
+        for chunk in batched(new_clippings, self.EXPORT_CHUNK_SIZE):
+            chunk_clippings = list(chunk)
+            logger.info("Attempting to export %d new clippings to Readwise...", len(chunk_clippings))
+            export_result = self.readwise_client.send_highlights_concurrently(chunk_clippings)
+            # Update based on what was actually sent
+            stats.new_sent += export_result.sent
+            stats.failed_to_send += export_result.failed
+            logger.info("Readwise export result: Sent=%d, Failed=%d", export_result.sent, export_result.failed)
+
+            # Save exactly the clippings that Readwise accepted to the database
+            successfully_sent_clippings = [
+                clipping for clipping, sent in zip(chunk_clippings, export_result.success_mask, strict=True) if sent
+            ]
+            if successfully_sent_clippings:
+                self._save_exported_highlights(successfully_sent_clippings)
 
         if stats.failed_to_send > 0:
             # Mark as partial success if some failed
-            status_ref[0] = "partial"  # Update the status by reference
             logger.warning("%d highlights failed to send to Readwise.", stats.failed_to_send)
-
-        # Save successfully exported highlights to the database
-        # We assume Readwise API handles its own duplicates, so we save all *sent* ones.
-        # Filter the *original* new_clippings list based on which ones were successfully sent.
-        # NOTE: Readwise API currently doesn't return IDs of successful highlights easily in bulk.
-        # For now, assume all `sent` were the first ones in the batch and save them.
-        # A more robust approach would need individual success tracking if the API supported it.
-        successfully_sent_clippings = new_clippings[:sent_count]
-        if successfully_sent_clippings:
-            self._save_exported_highlights(successfully_sent_clippings)
+            return "partial"
+        return "success"
 
     def _complete_process(
-        self, session_id: int | None, stats: ExportStats, session_status: str, start_time: datetime
+        self, session_id: int | None, stats: ExportStats, session_status: str, start_time: float
     ) -> None:
         """Complete the process and log results."""
         # Complete the export session tracking - only if not in dry-run mode
@@ -185,41 +232,78 @@ class Kindle2Readwise:
                 "failed": stats.failed_to_send,
                 # Add other relevant stats if needed
             }
-            self.db.complete_export_session(session_id, stats=final_stats_dict, status=session_status)
+            # Only a fully successful export may let the next run skip its duplicate checks
+            fingerprint = self._source_fingerprint() if session_status == "success" else None
+            self.db.complete_export_session(
+                session_id, stats=final_stats_dict, status=session_status, source_fingerprint=fingerprint
+            )
 
-        end_time = datetime.now()
-        duration = end_time - start_time
         logger.info(
             "Processing finished in %.2f seconds. Status: %s. Results: %s",
-            duration.total_seconds(),
+            time.perf_counter() - start_time,
             "dry_run" if self.dry_run else session_status,
             stats,
         )
 
-    def _filter_duplicates(self, clippings: list[KindleClipping]) -> tuple[list[KindleClipping], int]:
-        """Filter out clippings that already exist in the database."""
-        logger.debug("Filtering %d clippings for duplicates...", len(clippings))
-        new_clippings = []
-        duplicate_count = 0
-
-        for clipping in clippings:
-            # Basic check: ignore clippings without content, though parser might already do this
-            if not clipping.content:
-                logger.debug(
-                    "Skipping clipping with no content: Title='%s', Loc='%s'", clipping.title, clipping.location
-                )
-                continue
+    def _source_fingerprint(self) -> str | None:
+        """Fingerprint the clippings file together with the state of the highlights table.
 
-            # Check database for duplicates based on hash
-            if self.db.highlight_exists(clipping.title, clipping.author or "", clipping.content):
-                logger.debug("Duplicate found: Title='%s', Loc='%s'", clipping.title, clipping.location)
-                duplicate_count += 1
-            else:
-                # Only add non-duplicates to the list to be sent
-                new_clippings.append(clipping)
-
-        logger.debug("Filtering complete. Found %d duplicates.", duplicate_count)
-        return new_clippings, duplicate_count
+        The fingerprint changes whenever the file is rewritten or highlights are added to or
+        deleted from the database, e.g. to have them exported again. The database side is a
+        change counter rather than the row count, which a delete plus an insert would restore.
+        """
+        try:
+            file_stat = self.clippings_file.stat()
+        except OSError:
+            return None
+        change_count = self.db.get_highlights_change_count()
+        return f"{file_stat.st_size}:{file_stat.st_mtime_ns}:{change_count}"
+
+    def _source_unchanged(self) -> bool:
+        """Check whether nothing changed since the last successful export of this file."""
+        fingerprint = self._source_fingerprint()
+        if fingerprint is None:
+            return False
+        return fingerprint == self.db.last_successful_fingerprint(str(self.clippings_file))
+
+    def _filter_duplicates(self, clippings: Iterable[KindleClipping], stats: ExportStats) -> Iterator[KindleClipping]:
+        """Yield the clippings that do not already exist in the database.
+
+        Clippings are checked in batches of DUPLICATE_CHECK_BATCH_SIZE with one bulk lookup
+        per batch, and `stats.total_processed` / `stats.duplicates_skipped` are updated as
+        the input is consumed. Repeats within the file itself (e.g. re-highlighted passages)
+        are also skipped after their first occurrence.
+        """
+        # Checked once per run so disabled debug logging costs nothing per clipping
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        seen: set[bytes] = set()
+        for batch in batched(clippings, self.DUPLICATE_CHECK_BATCH_SIZE):
+            stats.total_processed += len(batch)
+            logger.debug("Filtering %d clippings for duplicates...", len(batch))
+
+            candidates = []
+            for clipping in batch:
+                # Basic check: ignore clippings without content, though parser might already do this
+                if not clipping.content:
+                    if debug_enabled:
+                        logger.debug(
+                            "Skipping clipping with no content: Title='%s', Loc='%s'", clipping.title, clipping.location
+                        )
+                    continue
+                candidates.append(clipping)
+
+            # Check the whole batch against the database in a single query
+            existing = self.db.existing_hashes([c.hash for c in candidates])
+
+            for clipping in candidates:
+                if clipping.hash in seen or clipping.hash in existing:
+                    if debug_enabled:
+                        logger.debug("Duplicate found: Title='%s', Loc='%s'", clipping.title, clipping.location)
+                    stats.duplicates_skipped += 1
+                else:
+                    # Only pass non-duplicates on to be sent
+                    seen.add(clipping.hash)
+                    yield clipping
 
     def _save_exported_highlights(self, successfully_sent_clippings: list[KindleClipping]) -> None:
         """Save successfully exported highlights to the database."""
@@ -227,12 +311,25 @@ class Kindle2Readwise:
             return
 
         logger.info("Saving %d successfully exported highlights to the database...", len(successfully_sent_clippings))
+        try:
+            saved_count = self.db.save_highlights_bulk(successfully_sent_clippings, export_status="success")
+        except sqlite3.IntegrityError:
+            logger.warning("Bulk save failed, saving highlights one at a time instead.", exc_info=True)
+            saved_count = self._save_highlights_individually(successfully_sent_clippings)
+        except Exception:
+            # The highlights already reached Readwise, so log instead of failing the export
+            logger.error("Failed to save exported highlights to DB.", exc_info=True)
+            return
+        logger.info("Finished saving %d highlights to the database.", saved_count)
+
+    def _save_highlights_individually(self, clippings: list[KindleClipping]) -> int:
+        """Save highlights row by row so one bad record does not prevent saving the rest."""
         saved_count = 0
-        for clipping in successfully_sent_clippings:
+        for clipping in clippings:
             try:
-                # Pass the whole KindleClipping object to the DAO method
-                self.db.save_highlight(clipping, export_status="success")
-                saved_count += 1
+                # The unique hash index rejects already stored highlights in the same statement
+                if self.db.try_insert_highlight(clipping, export_status="success"):
+                    saved_count += 1
             except Exception:
                 # Log error but continue saving others if possible
                 logger.error(
@@ -241,53 +338,93 @@ class Kindle2Readwise:
                     clipping.location,
                     exc_info=True,
                 )
-        logger.info("Finished saving %d highlights to the database.", saved_count)
+        return saved_count
 
     def close_db(self) -> None:
         """Close the database connection explicitly if needed."""
         if self.db:
             self.db.close()
 
+    def _parse_clippings(self) -> list[KindleClipping]:
+        """Parse the clippings file, reusing the previous result while the file is unchanged.
+
+        The cache is keyed on the file's path, nanosecond mtime and size, so any rewrite of
+        the file (including one within the same second, or one that preserves the mtime but
+        changes the length) triggers a fresh parse.
+        """
+        try:
+            file_stat = self.clippings_file.stat()
+        except OSError:
+            # Let the parser surface any problem with the file
+            return self.parser.parse()
+
+        cache_key = (str(self.clippings_file), file_stat.st_mtime_ns, file_stat.st_size)
+        if self._parsed_cache is not None and self._parsed_cache[0] == cache_key:
+            logger.debug("Reusing parsed clippings for unchanged file: %s", self.clippings_file)
+            return self._parsed_cache[1]
+
+        clippings = self.parser.parse()
+        self._parsed_cache = (cache_key, clippings)
+        return clippings
+
+    def _compute_pending(self, all_clippings: list[KindleClipping]) -> tuple[list[dict], int]:
+        """Determine which of the parsed clippings have not been exported yet.
+
+        Args:
+            all_clippings: Clippings parsed from the clippings file
+
+        Returns:
+            Tuple of (pending highlight dictionaries, number of duplicates skipped)
+        """
+        check_duplicates = not self.skip_dedup_check
+        existing: set[bytes] = set()
+        if check_duplicates:
+            existing = self.db.existing_hashes([c.hash for c in all_clippings])
+
+        pending_highlights = []
+        duplicates_skipped = 0
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        seen: set[bytes] = set()
+        for clipping in all_clippings:
+            if check_duplicates:
+                if clipping.hash in seen or clipping.hash in existing:
+                    if debug_enabled:
+                        logger.debug("Already exported: Title='%s', Loc='%s'", clipping.title, clipping.location)
+                    duplicates_skipped += 1
+                    continue
+                seen.add(clipping.hash)
+
+            # Convert KindleClipping to dictionary for display in interactive mode
+            highlight_dict = {
+                "id": len(pending_highlights) + 1,  # 1-based position in the pending list
+                "title": clipping.title,
+                "author": clipping.author or "Unknown",
+                "highlight": clipping.content,
+                "location": clipping.location or "Unknown",
+                "date": clipping.date or "Unknown",
+                # Store the original clipping object for processing
+                "original_clipping": clipping,
+            }
+            pending_highlights.append(highlight_dict)
+
+        logger.info("Found %d new highlights to export.", len(pending_highlights))
+        return pending_highlights, duplicates_skipped
+
     def get_pending_highlights(self) -> list[dict]:
         """Get highlights that would be exported but have not been sent to Readwise yet.
 
+        IDs are contiguous starting at 1, so the highlight with ID ``n`` is at index ``n - 1``
+        of the returned list. `process_selected` relies on this to look up selections.
+
         Returns:
             A list of dictionaries containing highlight information
         """
         logger.debug("Getting pending highlights that have not been exported yet.")
 
-        # Parse clippings
-        clippings = self.parser.parse()
+        clippings = self._parse_clippings()
         logger.info("Found %d highlights in clippings file.", len(clippings))
 
-        # Filter out highlights that are already in the database
-        pending_highlights = []
-
-        for idx, clipping in enumerate(clippings):
-            # Check if highlight exists in the database directly
-            # KindleClipping objects have attributes, not dictionary keys
-            exists = self.db.highlight_exists(
-                clipping.title,
-                clipping.author or "",  # Handle potential None with or ""
-                clipping.content,
-            )
-
-            if not exists:
-                # Convert KindleClipping to dictionary for display in interactive mode
-                highlight_dict = {
-                    "id": idx + 1,  # 1-based ID
-                    "title": clipping.title,
-                    "author": clipping.author or "Unknown",
-                    "highlight": clipping.content,
-                    "location": clipping.location or "Unknown",
-                    "date": clipping.date or "Unknown",
-                    # Store the original clipping object for processing
-                    "original_clipping": clipping,
-                }
-                pending_highlights.append(highlight_dict)
-
-        logger.info("Found %d new highlights to export.", len(pending_highlights))
-        return pending_highlights
+        return self._compute_pending(clippings)[0]
 
     def process_selected(self, selected_ids: list[int]) -> ExportStats:
         """Process only selected highlights from the clippings file.
@@ -300,18 +437,14 @@ class Kindle2Readwise:
         """
         logger.debug("Processing selected highlights with IDs: %s", selected_ids)
 
-        # Parse all highlights
-        all_clippings = self.parser.parse()
+        # Parse and filter once; the parse is shared with a preceding get_pending_highlights call
+        all_clippings = self._parse_clippings()
         logger.info("Found %d highlights in clippings file.", len(all_clippings))
+        pending_highlights, duplicates_skipped = self._compute_pending(all_clippings)
 
-        # Get the pending highlights to match with selected IDs
-        pending_highlights = self.get_pending_highlights()
-
-        # Create ID to highlight mapping for easier lookup
-        id_to_highlight = {h["id"]: h for h in pending_highlights}
-
-        # Find the selected highlights
-        selected_highlights = [id_to_highlight[id] for id in selected_ids if id in id_to_highlight]
+        # IDs are contiguous from 1, so they index directly into the pending list
+        n = len(pending_highlights)
+        selected_highlights = [pending_highlights[i - 1] for i in selected_ids if 1 <= i <= n]
 
         # Extract the original clipping objects
         selected_clippings = [h["original_clipping"] for h in selected_highlights]
@@ -320,7 +453,7 @@ class Kindle2Readwise:
         stats = ExportStats()
         stats.total_processed = len(all_clippings)
         stats.new_sent = 0
-        stats.duplicates_skipped = stats.total_processed - len(pending_highlights)
+        stats.duplicates_skipped = duplicates_skipped
         stats.failed_to_send = 0
 
         # Process selected highlights
@@ -337,15 +470,15 @@ class Kindle2Readwise:
                 stats.new_sent = len(selected_clippings)
             else:
                 # Send to Readwise
-                export_result = self.readwise_client.send_highlights(selected_clippings)
+                export_result = self.readwise_client.send_highlights_concurrently(selected_clippings)
                 # Update based on what was actually sent
-                sent_count = export_result.get("sent", 0)
-                stats.new_sent = sent_count
-                stats.failed_to_send = export_result.get("failed", 0)
+                stats.new_sent = export_result.sent
+                stats.failed_to_send = export_result.failed
 
                 # Save successfully exported highlights to the database
-                if sent_count > 0:
-                    self._save_exported_highlights(selected_clippings[:sent_count])
+                self._save_exported_highlights(
+                    [c for c, sent in zip(selected_clippings, export_result.success_mask, strict=True) if sent]
+                )
         else:
             logger.info("No highlights selected for export.")
 
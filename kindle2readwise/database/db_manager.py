@@ -1,23 +1,59 @@
-import hashlib
 import logging
 from datetime import datetime
+from itertools import batched
 from pathlib import Path
 from typing import Any
 
 import sqlite_utils
 
 from ..parser.models import KindleClipping
+from ..utils.hashing import generate_highlight_hash
 from .models import HighlightFilters
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_DB_PATH = Path.cwd() / "data" / "kindle2readwise.db"
 
+# Connection pragmas: NORMAL sync is safe under WAL and turns per-transaction fsyncs into
+# checkpoint-time ones; the rest keep temp tables, recent pages and the mapped file in memory.
+SQLITE_PRAGMAS = (
+    "synchronous = NORMAL",
+    "temp_store = MEMORY",
+    "mmap_size = 268435456",  # 256 MiB
+    "cache_size = -20000",  # ~20 MB page cache
+)
+
+# Hashes looked up per existence query, kept below SQLite's default bound-parameter limit of 999
+EXISTING_HASHES_CHUNK_SIZE = 500
+
+INSERT_HIGHLIGHT_SQL = (
+    "INSERT OR IGNORE INTO highlights (highlight_hash, title, author, text, location, "
+    "date_highlighted, date_exported, readwise_id, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _highlight_row(
+    clipping: KindleClipping, export_status: str, date_exported: str, readwise_id: str | None = None
+) -> tuple:
+    """Build the INSERT_HIGHLIGHT_SQL parameters for a clipping."""
+    return (
+        clipping.hash,
+        clipping.title,
+        clipping.author,
+        clipping.content,
+        clipping.location,
+        clipping.date.isoformat() if clipping.date else None,
+        date_exported,
+        readwise_id,
+        export_status,
+    )
+
 
-def generate_highlight_hash(title: str, author: str | None, text: str) -> str:
-    """Generate a unique SHA-256 hash for a highlight based on its core content."""
-    hash_input = f"{title or ''}|{author or ''}|{text}"
-    return hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
+def _with_hex_hash(row: dict[str, Any]) -> dict[str, Any]:
+    """Return a highlight row with its raw hash hex-encoded for display and JSON output."""
+    if isinstance(row.get("highlight_hash"), bytes):
+        row["highlight_hash"] = row["highlight_hash"].hex()
+    return row
 
 
 class HighlightsDAO:
@@ -36,10 +72,20 @@ class HighlightsDAO:
             logger.info("Initializing HighlightsDAO with in-memory database.")
 
         self.db = sqlite_utils.Database(self.db_path)
+        self._configure_connection()
         self._initialize_db()
         # Apply migrations after ensuring tables exist
         self._apply_migrations()
 
+    def _configure_connection(self) -> None:
+        """Enable WAL journaling and apply the performance pragmas to the connection."""
+        if str(self.db_path) != ":memory:":
+            # WAL lets readers proceed during writes and groups commits into checkpoints
+            self.db.enable_wal()
+        for pragma in SQLITE_PRAGMAS:
+            self.db.execute(f"PRAGMA {pragma}")
+        logger.debug("Applied SQLite pragmas: %s", ", ".join(SQLITE_PRAGMAS))
+
     def _initialize_db(self) -> None:
         """Create database tables and indexes if they don't exist."""
         created_tables = []
@@ -48,7 +94,7 @@ class HighlightsDAO:
             self.db["highlights"].create(
                 {
                     "id": int,
-                    "highlight_hash": str,
+                    "highlight_hash": bytes,  # Raw SHA-256 digest
                     "title": str,
                     "author": str,
                     "text": str,
@@ -98,12 +144,38 @@ class HighlightsDAO:
 
     def highlight_exists(self, title: str, author: str | None, text: str) -> bool:
         """Check if a highlight with the same content already exists in the database."""
-        highlight_hash = generate_highlight_hash(title, author, text)
-        logger.debug("Checking existence for highlight hash: %s", highlight_hash)
+        return self.highlight_hash_exists(generate_highlight_hash(title, author, text))
+
+    def highlight_hash_exists(self, highlight_hash: bytes) -> bool:
+        """Check if a highlight with the given precomputed hash already exists in the database."""
+        logger.debug("Checking existence for highlight hash: %s", highlight_hash.hex())
         exists = self.db["highlights"].count_where("highlight_hash = ?", [highlight_hash]) > 0
-        logger.debug("Highlight with hash %s %s.", highlight_hash, "exists" if exists else "does not exist")
+        logger.debug("Highlight with hash %s %s.", highlight_hash.hex(), "exists" if exists else "does not exist")
         return exists
 
+    def existing_hashes(self, hashes: list[bytes]) -> set[bytes]:
+        """Return the subset of the given highlight hashes that already exist in the database.
+
+        The hashes are bound as BLOB parameters and answered through the unique hash index,
+        EXISTING_HASHES_CHUNK_SIZE per query.
+
+        Args:
+            hashes: Highlight hashes to look up
+
+        Returns:
+            Set of hashes that are already stored
+        """
+        existing: set[bytes] = set()
+        for chunk in batched(hashes, EXISTING_HASHES_CHUNK_SIZE):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.db.execute(
+                f"SELECT highlight_hash FROM highlights WHERE highlight_hash IN ({placeholders})",
+                chunk,
+            )
+            existing.update(row[0] for row in rows)
+        logger.debug("%d of %d highlight hashes already exist.", len(existing), len(hashes))
+        return existing
+
     def save_highlight(
         self,
         clipping: KindleClipping,
@@ -111,8 +183,8 @@ class HighlightsDAO:
         readwise_id: str | None = None,
     ) -> None:
         """Record an exported highlight in the database."""
-        highlight_hash = generate_highlight_hash(clipping.title, clipping.author, clipping.content)
-        logger.debug("Saving highlight with hash: %s, Status: %s", highlight_hash, export_status)
+        highlight_hash = clipping.hash
+        logger.debug("Saving highlight with hash: %s, Status: %s", highlight_hash.hex(), export_status)
 
         record = {
             "highlight_hash": highlight_hash,
@@ -129,15 +201,76 @@ class HighlightsDAO:
         try:
             # Use upsert to insert or update based on hash
             self.db["highlights"].upsert(record, hash_id="highlight_hash", alter=True)
-            logger.info("Successfully saved/updated highlight: Title='%s', Hash=%s", clipping.title, highlight_hash[:8])
+            logger.info(
+                "Successfully saved/updated highlight: Title='%s', Hash=%s", clipping.title, highlight_hash.hex()[:8]
+            )
         except Exception:
             logger.error(
                 "Failed to save highlight: Title='%s', Hash=%s",
                 clipping.title,
-                highlight_hash[:8],
+                highlight_hash.hex()[:8],
                 exc_info=True,
             )
 
+    def try_insert_highlight(
+        self,
+        clipping: KindleClipping,
+        export_status: str = "success",
+        readwise_id: str | None = None,
+    ) -> bool:
+        """Record an exported highlight unless one with the same hash is already stored.
+
+        Unlike `save_highlight`, an existing record is left untouched, and the duplicate check
+        is done by the unique hash index in the same statement rather than a separate query.
+
+        Args:
+            clipping: Clipping to record
+            export_status: Status of the export operation ('success', 'error', etc.)
+            readwise_id: ID assigned by Readwise, if known
+
+        Returns:
+            True if the highlight was inserted, False if it was already stored
+
+        Raises:
+            sqlite3.IntegrityError: If the row violates a constraint other than the unique hash.
+        """
+        row = _highlight_row(clipping, export_status, datetime.now().isoformat(), readwise_id)
+        with self.db.conn:
+            cursor = self.db.conn.execute(INSERT_HIGHLIGHT_SQL, row)
+        return cursor.rowcount == 1
+
+    def save_highlights_bulk(self, clippings: list[KindleClipping], export_status: str = "success") -> int:
+        """Record several exported highlights in a single transaction.
+
+        Highlights whose hash is already stored are left untouched.
+
+        Args:
+            clippings: Clippings to record
+            export_status: Status of the export operation ('success', 'error', etc.)
+
+        Returns:
+            Number of highlights inserted
+
+        Raises:
+            sqlite3.IntegrityError: If a row violates a constraint; nothing is saved in that case.
+        """
+        if not clippings:
+            return 0
+
+        date_exported = datetime.now().isoformat()
+        rows = [_highlight_row(clipping, export_status, date_exported) for clipping in clippings]
+        logger.debug("Saving %d highlights in bulk, Status: %s", len(rows), export_status)
+
+        conn = self.db.conn
+        with conn:  # Commits once at the end, rolls back on error
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.executemany(INSERT_HIGHLIGHT_SQL, rows)
+        inserted = cursor.rowcount
+
+        logger.info("Saved %d highlights in bulk (%d already present).", inserted, len(rows) - inserted)
+        return inserted
+
     def start_export_session(self, source_file: str) -> int:
         """Record the start of an export session and return the session ID.
 
@@ -166,13 +299,20 @@ class HighlightsDAO:
             # Still return a unique ID for recovery
             return hash(datetime.now().isoformat()) % 1000000  # Simple fallback ID
 
-    def complete_export_session(self, session_id: int, stats: dict[str, Any], status: str = "success") -> None:
+    def complete_export_session(
+        self,
+        session_id: int,
+        stats: dict[str, Any],
+        status: str = "success",
+        source_fingerprint: str | None = None,
+    ) -> None:
         """Update an export session with completion details.
 
         Args:
             session_id: ID of the session to update
             stats: Statistics about the export operation
             status: Status of the export operation
+            source_fingerprint: Fingerprint of the source file and database state at completion
         """
         logger.debug("Completing export session %s with status: %s", session_id, status)
         try:
@@ -184,12 +324,37 @@ class HighlightsDAO:
                     "highlights_new": stats.get("sent", 0),
                     "highlights_dupe": stats.get("duplicates", 0),
                     "status": status,
+                    "source_fingerprint": source_fingerprint,
                 },
             )
             logger.info("Successfully updated export session %s", session_id)
         except Exception as e:
             logger.error("Failed to update export session %s: %s", session_id, e, exc_info=True)
 
+    def last_successful_fingerprint(self, source_file: str) -> str | None:
+        """Get the source fingerprint recorded by the most recent successful export of a file.
+
+        Args:
+            source_file: Path to the source clippings file
+
+        Returns:
+            The stored fingerprint, or None if the file was never exported successfully
+        """
+        try:
+            rows = list(
+                self.db["export_sessions"].rows_where(
+                    "source_file = ? AND status = ?",
+                    [source_file, "success"],
+                    order_by="start_time desc",
+                    limit=1,
+                    select="source_fingerprint",
+                )
+            )
+        except Exception as e:
+            logger.error("Failed to look up last export fingerprint: %s", e, exc_info=True)
+            return None
+        return rows[0]["source_fingerprint"] if rows else None
+
     def get_export_history(self, limit: int = 10) -> list[dict[str, Any]]:
         """Get the history of export sessions.
 
@@ -257,7 +422,7 @@ class HighlightsDAO:
                 )
             )
             logger.debug("Found %d highlights for session %s", len(highlights), session_id)
-            return highlights
+            return [_with_hex_hash(highlight) for highlight in highlights]
         except Exception as e:
             logger.error("Error fetching highlights for session %s: %s", session_id, e)
             return []
@@ -387,7 +552,7 @@ class HighlightsDAO:
                 )
 
             logger.debug("Retrieved %d highlights", len(highlights))
-            return highlights
+            return [_with_hex_hash(highlight) for highlight in highlights]
         except Exception as e:
             logger.error("Failed to retrieve highlights: %s", e, exc_info=True)
             return []
@@ -500,6 +665,18 @@ class HighlightsDAO:
             logger.error("Failed to get highlight count: %s", e, exc_info=True)
             return 0
 
+    def get_highlights_change_count(self) -> int:
+        """Get the number of changes made to the highlights table so far.
+
+        The counter is maintained by triggers on every insert, delete and hash update and only
+        ever grows, so a different value means the table changed since it was last observed.
+
+        Returns:
+            The running change count of the highlights table
+        """
+        row = self.db.execute("SELECT change_count FROM highlights_changes WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
     def get_session_count(self) -> int:
         """Get the total number of export sessions in the database.
 
@@ -513,6 +690,41 @@ class HighlightsDAO:
             return 0
 
     # --- Migration Handling ---
+    def _migrate_hashes_to_bytes(self) -> None:
+        """Convert hex-encoded highlight hashes to the raw digests they encode.
+
+        The column keeps its declared TEXT type in existing databases; TEXT affinity stores
+        BLOB values unchanged, so no table rebuild is needed.
+        """
+        rows = self.db.execute("SELECT id, highlight_hash FROM highlights WHERE typeof(highlight_hash) = 'text'")
+        updates = []
+        for row_id, hex_hash in rows.fetchall():
+            try:
+                updates.append((bytes.fromhex(hex_hash), row_id))
+            except ValueError:
+                logger.warning("Leaving non-hex highlight hash of highlight %d unchanged.", row_id)
+        with self.db.conn:
+            self.db.conn.executemany("UPDATE highlights SET highlight_hash = ? WHERE id = ?", updates)
+        logger.info("Converted %d highlight hashes to raw bytes.", len(updates))
+
+    def _add_highlights_change_counter(self) -> None:
+        """Create the highlights change counter and the triggers that keep it current.
+
+        Row counts and the highest id cannot detect a delete followed by an insert, as SQLite
+        reuses the id of a deleted last row.
+        """
+        with self.db.conn:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS highlights_changes (id INTEGER PRIMARY KEY, change_count INTEGER)"
+            )
+            self.db.execute("INSERT OR IGNORE INTO highlights_changes (id, change_count) VALUES (1, 0)")
+            for event in ("INSERT", "DELETE", "UPDATE OF highlight_hash"):
+                trigger_name = "highlights_count_" + event.split()[0].lower()
+                self.db.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {event} ON highlights "
+                    "BEGIN UPDATE highlights_changes SET change_count = change_count + 1 WHERE id = 1; END"
+                )
+
     def _apply_migrations(self) -> None:
         """Apply any pending database migrations."""
         logger.debug("Checking for and applying database migrations...")
@@ -526,6 +738,13 @@ class HighlightsDAO:
         # Define migrations as a list of tuples: (id, name, function)
         # Add future migrations here. Lambdas are fine for simple sqlite-utils calls.
         migrations: list[tuple[int, str, callable]] = [
+            (
+                1,
+                "Add source_fingerprint to export_sessions",
+                lambda: self.db["export_sessions"].add_column("source_fingerprint", str),
+            ),
+            (2, "Store highlight hashes as raw bytes", self._migrate_hashes_to_bytes),
+            (3, "Count changes to the highlights table", self._add_highlights_change_counter),
             # Future migrations will be added here
         ]
 
@@ -561,6 +780,8 @@ class HighlightsDAO:
         """Close the database connection."""
         if self.db:
             logger.info("Closing database connection to: %s", self.db_path)
+            # Closing checkpoints the WAL back into the database file and removes it
+            self.db.close()
             self.db = None  # Allow garbage collection
 
 
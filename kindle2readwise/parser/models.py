@@ -1,11 +1,18 @@
 from datetime import datetime
+from functools import cached_property
+from typing import Any, Self
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from ..utils.hashing import generate_highlight_hash
 
 
 class KindleClipping(BaseModel):
     """Represents a single Kindle clipping (highlight, note, or bookmark)."""
 
+    # Frozen so the cached hash can never go stale through field assignment
+    model_config = ConfigDict(frozen=True)
+
     title: str = Field(description="The title of the book")
     author: str | None = Field(default=None, description="The author of the book")
     type: str = Field(description="Type of clipping: 'highlight', 'note', or 'bookmark'")
@@ -14,6 +21,17 @@ class KindleClipping(BaseModel):
     date: datetime = Field(description="Date when the clipping was created")
     content: str = Field(description="Content of the clipping")
 
+    @cached_property
+    def hash(self) -> bytes:
+        """Hash identifying this highlight in the database, computed once per clipping."""
+        return generate_highlight_hash(self.title, self.author, self.content)
+
+    def model_copy(self, *, update: dict[str, Any] | None = None, deep: bool = False) -> Self:
+        """Copy the clipping, dropping the cached hash so the copy hashes its own fields."""
+        copied = super().model_copy(update=update, deep=deep)
+        copied.__dict__.pop("hash", None)
+        return copied
+
     def get_identifier(self) -> str:
         """Generate a unique identifier for the clipping based on title, author, and content."""
         identifier_parts = [self.title, self.author or "", self.content]
@@ -1,5 +1,6 @@
 import logging
 import re
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 
@@ -50,53 +51,56 @@ class KindleClippingsParser:
         Returns:
             List of KindleClipping objects
         """
-        logger.info("Starting to parse clippings file: %s", self.clippings_file)
+        return list(self.iter_parse())
 
-        content = self._read_clippings_file()
-        raw_clippings = self._split_content(content)
-        return self._process_clippings(raw_clippings)
+    def iter_parse(self) -> Iterator[KindleClipping]:
+        """Parse the clippings file lazily, yielding clippings as they are read.
 
-    def _read_clippings_file(self) -> str:
-        """Read content from the clippings file.
+        Only one raw section is held in memory at a time, so callers that consume the
+        clippings in a streaming fashion never materialize the whole file.
 
-        Returns:
-            String content of the file
+        Yields:
+            KindleClipping objects in file order
+        """
+        logger.info("Starting to parse clippings file: %s", self.clippings_file)
+        yield from self._process_clippings(self._iter_sections())
+
+    def _iter_sections(self) -> Iterator[str]:
+        """Read the clippings file incrementally and yield the raw sections between separators.
+
+        Yields:
+            Raw clipping strings
 
         Raises:
             OSError: If file can't be read
         """
+        section_count = 0
         try:
             with open(self.clippings_file, encoding="utf-8-sig") as f:
-                content = f.read()
-            logger.debug("Successfully read %d bytes from %s", len(content), self.clippings_file)
-            return content
+                buffer = ""
+                for line in f:
+                    buffer += line
+                    if self.SEPARATOR in line:
+                        *sections, buffer = buffer.split(self.SEPARATOR)
+                        section_count += len(sections)
+                        yield from sections
+                section_count += 1
+                yield buffer
         except Exception as e:
             logger.error("Failed to read clippings file %s", self.clippings_file, exc_info=True)
             raise OSError(f"Could not read clippings file: {self.clippings_file}") from e
+        logger.debug("Read %d raw sections from %s", section_count, self.clippings_file)
 
-    def _split_content(self, content: str) -> list[str]:
-        """Split content by separator.
+    def _process_clippings(self, raw_clippings: Iterable[str]) -> Iterator[KindleClipping]:
+        """Process raw clippings one at a time.
 
         Args:
-            content: Full content of clippings file
+            raw_clippings: Iterable of raw clipping strings
 
-        Returns:
-            List of raw clipping strings
-        """
-        raw_clippings = content.split(self.SEPARATOR)
-        logger.debug("Split content into %d raw sections.", len(raw_clippings))
-        return raw_clippings
-
-    def _process_clippings(self, raw_clippings: list[str]) -> list[KindleClipping]:
-        """Process all raw clippings.
-
-        Args:
-            raw_clippings: List of raw clipping strings
-
-        Returns:
-            List of parsed KindleClipping objects
+        Yields:
+            Parsed KindleClipping objects
         """
-        clippings = []
+        parsed_count = 0
         processed_count = 0
         skipped_count = 0
         error_count = 0
@@ -120,12 +124,12 @@ class KindleClippingsParser:
                     bookmark_count += 1
                     logger.debug("Skipping bookmark in section %d.", section_index)
                     continue
-                clippings.append(clipping)
+                parsed_count += 1
+                yield clipping
             else:
                 error_count += 1
 
-        self._log_parsing_summary(processed_count, skipped_count, bookmark_count, error_count, len(clippings))
-        return clippings
+        self._log_parsing_summary(processed_count, skipped_count, bookmark_count, error_count, parsed_count)
 
     def _log_parsing_summary(self, processed: int, skipped: int, bookmarks: int, errors: int, parsed: int) -> None:
         """Log a summary of parsing statistics.
@@ -1,4 +1,4 @@
 from .client import ReadwiseAPIClient
-from .models import ReadwiseHighlight, ReadwiseHighlightBatch
+from .models import ReadwiseHighlight, ReadwiseHighlightBatch, ReadwiseSendResult
 
-__all__ = ["ReadwiseAPIClient", "ReadwiseHighlight", "ReadwiseHighlightBatch"]
+__all__ = ["ReadwiseAPIClient", "ReadwiseHighlight", "ReadwiseHighlightBatch", "ReadwiseSendResult"]
@@ -1,11 +1,16 @@
+import hashlib
+import json
 import logging
 import re  # Add re import
 import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+from pathlib import Path
 
 import requests
 
 from ..parser.models import KindleClipping
-from .models import ReadwiseHighlight, ReadwiseHighlightBatch
+from .models import ReadwiseHighlight, ReadwiseHighlightBatch, ReadwiseSendResult
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
@@ -21,19 +26,31 @@ class ReadwiseAPIClient:
     # HTTP status codes
     HTTP_OK = 200
     HTTP_NO_CONTENT = 204
+    HTTP_TOO_MANY_REQUESTS = 429
 
     # Batch size and rate limiting
     MAX_BATCH_SIZE = 100
     REQUEST_DELAY = 0.25  # 250ms between requests to stay under rate limits
+    MAX_CONCURRENT_REQUESTS = 8  # Upper bound on batches in flight at once
+    MAX_RETRIES = 3  # Retries of a batch rejected with HTTP 429
+    DEFAULT_RETRY_AFTER = 1.0  # Seconds to wait after a 429 without a usable Retry-After, doubled per retry
 
-    def __init__(self, api_token: str):
+    # How long a successful token validation is trusted before asking Readwise again
+    TOKEN_CACHE_TTL = 3600  # seconds
+
+    def __init__(self, api_token: str, token_cache_path: Path | None = None):
         """Initialize the Readwise API client.
 
         Args:
             api_token: Readwise API token
+            token_cache_path: File remembering the last successful token validation across runs.
+                Validation results are not cached when omitted.
         """
         logger.debug("Initializing ReadwiseAPIClient.")
         self.api_token = api_token
+        self.token_cache_path = token_cache_path
+        # Monotonic time before which the next round of concurrent batches must not start
+        self._next_round_at = 0.0
         # Define headers before trying to use them for logging
         self.headers = {"Authorization": f"Token {api_token}", "Content-Type": "application/json"}
         # Redact token in logged headers for security
@@ -43,18 +60,29 @@ class ReadwiseAPIClient:
         }
         logger.debug("API Headers (token redacted): %s", log_headers)
 
-    def validate_token(self) -> bool:
+    def validate_token(self, force: bool = False) -> bool:
         """Validate the API token by making a request to the auth endpoint.
 
+        A successful validation of the same token within the last TOKEN_CACHE_TTL seconds is
+        reused from the token cache file instead of asking Readwise again.
+
+        Args:
+            force: Always ask Readwise, ignoring any cached validation
+
         Returns:
             True if the token is valid, False otherwise
         """
+        if not force and self._token_validation_cached():
+            logger.info("Readwise API token was validated recently; skipping validation request.")
+            return True
+
         logger.info("Validating Readwise API token...")
         try:
             response = requests.get(self.AUTH_ENDPOINT, headers=self.headers)
             is_valid = response.status_code == self.HTTP_NO_CONTENT
             if is_valid:
                 logger.info("Readwise API token is valid (HTTP %d).", response.status_code)
+                self._cache_token_validation()
             else:
                 logger.warning(
                     "Readwise API token validation failed. Status: %d, Response: %s",
@@ -69,6 +97,36 @@ class ReadwiseAPIClient:
             logger.error("Unexpected error during token validation.", exc_info=True)
             return False
 
+    def _token_hash(self) -> str:
+        """Hash of the API token, so the cache file never contains the token itself."""
+        return hashlib.sha256(self.api_token.encode("utf-8")).hexdigest()
+
+    def _token_validation_cached(self) -> bool:
+        """Check whether the token cache records a recent successful validation of this token."""
+        if self.token_cache_path is None:
+            return False
+        try:
+            cached = json.loads(self.token_cache_path.read_text(encoding="utf-8"))
+            age = time.time() - float(cached["validated_at"])
+            return cached["token_hash"] == self._token_hash() and 0 <= age < self.TOKEN_CACHE_TTL
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.debug("Ignoring unreadable token cache %s: %s", self.token_cache_path, e)
+            return False
+
+    def _cache_token_validation(self) -> None:
+        """Record a successful validation of this token in the token cache."""
+        if self.token_cache_path is None:
+            return
+        try:
+            self.token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.token_cache_path.write_text(
+                json.dumps({"token_hash": self._token_hash(), "validated_at": time.time()}), encoding="utf-8"
+            )
+        except OSError as e:
+            logger.warning("Failed to write token cache %s: %s", self.token_cache_path, e)
+
     def send_highlights(self, clippings: list[KindleClipping]) -> dict[str, int]:
         """Send highlights to Readwise.
 
@@ -85,18 +143,7 @@ class ReadwiseAPIClient:
         logger.info("Preparing to send %d clippings to Readwise.", len(clippings))
 
         # Convert clippings to Readwise highlights
-        highlights_to_send: list[ReadwiseHighlight] = []
-        conversion_skipped = 0
-        for clip in clippings:
-            highlight = self._convert_clipping_to_highlight(clip)
-            if highlight:
-                highlights_to_send.append(highlight)
-            else:
-                conversion_skipped += 1
-                logger.debug("Skipped converting clipping (no content or wrong type): %s", clip)
-
-        if conversion_skipped > 0:
-            logger.info("Skipped converting %d clippings (e.g., notes without content).", conversion_skipped)
+        highlights_to_send = [highlight for _, highlight in self._convert_clippings(clippings)]
 
         if not highlights_to_send:
             logger.info("No valid highlights to send after conversion.")
@@ -133,9 +180,105 @@ class ReadwiseAPIClient:
         )
         return results
 
+    def send_highlights_concurrently(self, clippings: list[KindleClipping]) -> ReadwiseSendResult:
+        """Send highlights to Readwise, with up to MAX_CONCURRENT_REQUESTS batches in flight.
+
+        Batches go out in rounds of MAX_CONCURRENT_REQUESTS, and each round is followed by
+        REQUEST_DELAY per batch before the next one starts, so the overall request rate matches
+        `send_highlights`. Unlike `send_highlights`, the result records which clippings were sent,
+        so callers can persist exactly the successful ones even when a batch in the middle fails.
+
+        Args:
+            clippings: List of KindleClipping objects to send
+
+        Returns:
+            ReadwiseSendResult with sent/failed counts and a per-clipping success mask
+        """
+        result = ReadwiseSendResult(success_mask=[False] * len(clippings))
+        if not clippings:
+            logger.info("No clippings provided to send.")
+            return result
+
+        logger.info("Preparing to send %d clippings to Readwise.", len(clippings))
+        converted = self._convert_clippings(clippings)
+        if not converted:
+            logger.info("No valid highlights to send after conversion.")
+            return result
+
+        # Each batch keeps the input indices of its highlights to build the success mask
+        batches = [converted[i : i + self.MAX_BATCH_SIZE] for i in range(0, len(converted), self.MAX_BATCH_SIZE)]
+        workers = min(self.MAX_CONCURRENT_REQUESTS, len(batches))
+        logger.info(
+            "Sending %d converted highlights in %d batches (%d concurrent requests).",
+            len(converted),
+            len(batches),
+            workers,
+        )
+
+        batch_results: list[dict[str, int]] = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for round_batches in batched(batches, workers):
+                self._wait_for_next_round()
+                batch_results.extend(executor.map(lambda batch: self._send_batch([h for _, h in batch]), round_batches))
+                # Keep the request rate of send_highlights: REQUEST_DELAY per request, here per round.
+                # Also applies to the first round of the next call, e.g. the next chunk of an export.
+                self._next_round_at = time.monotonic() + self.REQUEST_DELAY * len(round_batches)
+
+        for batch, batch_result in zip(batches, batch_results, strict=True):
+            result.sent += batch_result["sent"]
+            result.failed += batch_result["failed"]
+            # A batch is accepted or rejected as a whole
+            if batch_result["sent"]:
+                for index, _ in batch:
+                    result.success_mask[index] = True
+
+        logger.info("Finished sending highlights. Total Sent: %d, Total Failed: %d", result.sent, result.failed)
+        return result
+
+    def _wait_for_next_round(self) -> None:
+        """Sleep until the previous round of concurrent batches has used up its share of the rate limit."""
+        delay = self._next_round_at - time.monotonic()
+        if delay > 0:
+            logger.debug("Sleeping for %.2f seconds before next round of batches.", delay)
+            time.sleep(delay)
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """Seconds to wait before retrying a rate-limited request, honouring Retry-After."""
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            # Missing, or an HTTP date rather than a number of seconds
+            return self.DEFAULT_RETRY_AFTER * 2**attempt
+
+    def _convert_clippings(self, clippings: list[KindleClipping]) -> list[tuple[int, ReadwiseHighlight]]:
+        """Convert clippings to Readwise highlights, skipping those that cannot be sent.
+
+        Args:
+            clippings: List of KindleClipping objects to convert
+
+        Returns:
+            List of (index in `clippings`, ReadwiseHighlight) tuples
+        """
+        converted: list[tuple[int, ReadwiseHighlight]] = []
+        conversion_skipped = 0
+        for index, clip in enumerate(clippings):
+            highlight = self._convert_clipping_to_highlight(clip)
+            if highlight:
+                converted.append((index, highlight))
+            else:
+                conversion_skipped += 1
+                logger.debug("Skipped converting clipping (no content or wrong type): %s", clip)
+
+        if conversion_skipped > 0:
+            logger.info("Skipped converting %d clippings (e.g., notes without content).", conversion_skipped)
+        return converted
+
     def _send_batch(self, highlights: list[ReadwiseHighlight]) -> dict[str, int]:
         """Send a batch of highlights to Readwise.
 
+        A batch rejected with HTTP 429 is retried up to MAX_RETRIES times, after the delay
+        given by the Retry-After header or an exponential backoff.
+
         Args:
             highlights: List of ReadwiseHighlight objects to send
 
@@ -153,6 +296,18 @@ class ReadwiseAPIClient:
 
         try:
             response = requests.post(self.HIGHLIGHTS_ENDPOINT, headers=self.headers, json=batch_dict)
+            for attempt in range(self.MAX_RETRIES):
+                if response.status_code != self.HTTP_TOO_MANY_REQUESTS:
+                    break
+                delay = self._retry_delay(response, attempt)
+                logger.warning(
+                    "Rate limited by Readwise, retrying batch in %.1f seconds (retry %d of %d).",
+                    delay,
+                    attempt + 1,
+                    self.MAX_RETRIES,
+                )
+                time.sleep(delay)
+                response = requests.post(self.HIGHLIGHTS_ENDPOINT, headers=self.headers, json=batch_dict)
 
             if response.status_code == self.HTTP_OK:
                 logger.debug(
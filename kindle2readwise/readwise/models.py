@@ -42,3 +42,13 @@ class ReadwiseHighlightBatch(BaseModel):
                 for h in self.highlights
             ]
         }
+
+
+class ReadwiseSendResult(BaseModel):
+    """Outcome of sending a list of clippings to the Readwise API."""
+
+    sent: int = Field(default=0, description="Number of highlights accepted by Readwise")
+    failed: int = Field(default=0, description="Number of highlights in batches that Readwise rejected")
+    success_mask: list[bool] = Field(
+        default_factory=list, description="Per input clipping, whether it was sent successfully"
+    )
@@ -0,0 +1,12 @@
+"""Hashing helpers for identifying highlights across runs."""
+
+import hashlib
+
+
+def generate_highlight_hash(title: str, author: str | None, text: str) -> bytes:
+    """Generate a unique SHA-256 hash for a highlight based on its core content.
+
+    The raw 32-byte digest is returned; call `.hex()` on it for display.
+    """
+    hash_input = f"{title or ''}|{author or ''}|{text}"
+    return hashlib.sha256(hash_input.encode("utf-8")).digest()
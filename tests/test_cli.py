@@ -132,6 +132,23 @@ def test_cli_export_basic(tmp_path, mock_kindle2readwise):
         mock_instance.process.assert_called_once()
 
 
+@pytest.mark.usefixtures("set_token_env")
+@pytest.mark.parametrize(("extra_args", "force_validate"), [([], False), (["--force-validate"], True)])
+def test_cli_export_force_validate(tmp_path, mock_kindle2readwise, extra_args, force_validate):
+    """Test that --force-validate is passed through to validate_setup."""
+    clippings_file = tmp_path / "My Clippings.txt"
+    clippings_file.touch()
+
+    with patch("pathlib.Path.cwd") as mock_cwd, patch("kindle2readwise.cli.main.sys.exit") as mock_exit:
+        mock_cwd.return_value = tmp_path
+        mock_exit.side_effect = SystemExit(0)  # Success exit
+
+        run_cli(["export", *extra_args])
+
+        mock_instance = mock_kindle2readwise.return_value
+        mock_instance.validate_setup.assert_called_once_with(force_validate=force_validate)
+
+
 def test_cli_export_with_args(tmp_path, mock_kindle2readwise):
     """Test export command with explicit file, token, and db path args."""
     custom_clippings = tmp_path / "custom_clippings.txt"
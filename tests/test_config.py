@@ -17,6 +17,7 @@ from kindle2readwise.config import (
     get_config_value,
     get_data_dir,
     get_readwise_token,
+    get_token_cache_path,
     is_configured,
     list_config,
     load_config,
@@ -79,6 +80,15 @@ class TestConfigPaths:
             assert isinstance(data_dir, Path)
             assert data_dir == fake_config_dir / "data"
 
+    def test_get_token_cache_path_does_not_create_directory(self, tmp_path, monkeypatch):
+        """Test that resolving the token cache path leaves the filesystem untouched."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        with mock.patch("kindle2readwise.config.platform.system", return_value="Linux"):
+            token_cache_path = get_token_cache_path()
+
+        assert token_cache_path == tmp_path / "cache" / "kindle2readwise" / "token.json"
+        assert not token_cache_path.parent.exists()
+
 
 class TestConfigOperations:
     """Tests for configuration loading and saving functions."""
@@ -1,13 +1,17 @@
 """Tests for the core kindle2readwise functionality."""
 
+import sqlite3
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from kindle2readwise.core import Kindle2Readwise
-from kindle2readwise.exceptions import ValidationError
+from kindle2readwise.database import HighlightsDAO, generate_highlight_hash
+from kindle2readwise.exceptions import ProcessingError, ValidationError
+from kindle2readwise.models import ExportStats
 from kindle2readwise.parser import KindleClipping
+from kindle2readwise.readwise import ReadwiseSendResult
 
 # Constants to replace magic numbers
 TOTAL_CLIPPINGS = 3
@@ -54,14 +58,18 @@ def mock_app(sample_clippings):
     # Create actual mocks instead of patching
     mock_parser = MagicMock()
     mock_parser.parse.return_value = sample_clippings
+    mock_parser.iter_parse.side_effect = lambda: iter(sample_clippings)
 
     mock_client = MagicMock()
     mock_client.validate_token.return_value = True
-    mock_client.send_highlights.return_value = {"sent": len(sample_clippings), "failed": 0}
+    mock_client.send_highlights_concurrently.side_effect = lambda clippings: ReadwiseSendResult(
+        sent=len(clippings), failed=0, success_mask=[True] * len(clippings)
+    )
 
     mock_dao = MagicMock()
     mock_dao.highlight_exists.return_value = False
     mock_dao.start_export_session.return_value = 1
+    mock_dao.save_highlights_bulk.side_effect = lambda clippings, **_: len(clippings)
 
     # Create a Kindle2Readwise instance but replace its components with mocks
     with patch("pathlib.Path.exists", return_value=True):
@@ -75,18 +83,14 @@ def mock_app(sample_clippings):
     # Mock the _filter_duplicates method to simplify testing
     original_filter_duplicates = app._filter_duplicates
 
-    def mocked_filter_duplicates(clippings):
+    def mocked_filter_duplicates(clippings, stats):
         """Mocked version that respects the mock DAO's highlight_exists."""
-        new_clippings = []
-        duplicate_count = 0
-
         for clipping in clippings:
+            stats.total_processed += 1
             if app.db.highlight_exists(clipping.title, clipping.author or "", clipping.content):
-                duplicate_count += 1
+                stats.duplicates_skipped += 1
             else:
-                new_clippings.append(clipping)
-
-        return new_clippings, duplicate_count
+                yield clipping
 
     app._filter_duplicates = mocked_filter_duplicates
 
@@ -154,13 +158,14 @@ def test_process_new_highlights(mock_app):
     assert stats.failed_to_send == 0  # Assuming success
 
     # Verify parser was called
-    parser_mock.parse.assert_called_once()
+    parser_mock.iter_parse.assert_called_once()
 
     # Verify client was called with all highlights
-    client_mock.send_highlights.assert_called_once()
+    client_mock.send_highlights_concurrently.assert_called_once()
 
-    # Verify DAO was called to save highlights
-    assert dao_mock.save_highlight.call_count == TOTAL_CLIPPINGS
+    # Verify DAO was called to save all highlights in one bulk call
+    dao_mock.save_highlights_bulk.assert_called_once()
+    assert len(dao_mock.save_highlights_bulk.call_args[0][0]) == TOTAL_CLIPPINGS
 
     # Verify export session was created and completed
     dao_mock.start_export_session.assert_called_once()
@@ -176,6 +181,30 @@ def test_process_new_highlights(mock_app):
     assert exported_stats["failed"] == 0
 
 
+def test_process_error_keeps_counts_of_exported_chunks(mock_app, sample_clippings):
+    """Test that a parse error after the first export chunk keeps what was already sent."""
+    app, parser_mock, client_mock, dao_mock = mock_app
+    app.EXPORT_CHUNK_SIZE = TWO_CLIPPINGS
+
+    def failing_iter_parse():
+        yield from sample_clippings
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    parser_mock.iter_parse.side_effect = failing_iter_parse
+
+    with pytest.raises(ProcessingError):
+        app.process()
+
+    client_mock.send_highlights_concurrently.assert_called_once()
+    call_kwargs = dao_mock.complete_export_session.call_args.kwargs
+    assert call_kwargs["status"] == "error"
+    exported_stats = call_kwargs["stats"]
+    assert exported_stats["total_processed"] == TOTAL_CLIPPINGS
+    assert exported_stats["sent"] == TWO_CLIPPINGS
+    assert exported_stats["duplicates"] == CLIPPINGS_DUPE
+    assert exported_stats["failed"] == TOTAL_CLIPPINGS - TWO_CLIPPINGS
+
+
 def test_process_duplicate_highlights(mock_app):
     """Test processing with duplicate highlights."""
     app, parser_mock, client_mock, dao_mock = mock_app
@@ -192,13 +221,13 @@ def test_process_duplicate_highlights(mock_app):
     assert stats.failed_to_send == 0
 
     # Verify parser was called
-    parser_mock.parse.assert_called_once()
+    parser_mock.iter_parse.assert_called_once()
 
     # Verify client was not called since all highlights are duplicates
-    client_mock.send_highlights.assert_not_called()
+    client_mock.send_highlights_concurrently.assert_not_called()
 
     # Verify no highlights were saved
-    dao_mock.save_highlight.assert_not_called()
+    dao_mock.save_highlights_bulk.assert_not_called()
 
     # Verify export session was created and completed
     dao_mock.start_export_session.assert_called_once()
@@ -222,9 +251,6 @@ def test_process_mixed_highlights(mock_app):
     # First highlight is a duplicate, others are new
     dao_mock.highlight_exists.side_effect = [True, False, False]
 
-    # Set the exact return value to match test expectations
-    client_mock.send_highlights.return_value = {"sent": 2, "failed": 0}
-
     stats = app.process()
 
     # Verify the results using correct attribute names
@@ -234,14 +260,14 @@ def test_process_mixed_highlights(mock_app):
     assert stats.failed_to_send == 0
 
     # Verify parser was called
-    parser_mock.parse.assert_called_once()
+    parser_mock.iter_parse.assert_called_once()
 
     # Verify client was called with new highlights
-    client_mock.send_highlights.assert_called_once()
-    assert len(client_mock.send_highlights.call_args[0][0]) == TWO_CLIPPINGS
+    client_mock.send_highlights_concurrently.assert_called_once()
+    assert len(client_mock.send_highlights_concurrently.call_args[0][0]) == TWO_CLIPPINGS
 
     # Verify new highlights were saved
-    assert dao_mock.save_highlight.call_count == TWO_CLIPPINGS
+    assert len(dao_mock.save_highlights_bulk.call_args[0][0]) == TWO_CLIPPINGS
 
     # Verify export session was created and completed
     dao_mock.start_export_session.assert_called_once()
@@ -255,3 +281,214 @@ def test_process_mixed_highlights(mock_app):
     assert exported_stats["sent"] == TWO_CLIPPINGS
     assert exported_stats["duplicates"] == ONE_CLIPPING
     assert exported_stats["failed"] == 0
+
+
+def test_filter_duplicates_uses_bulk_lookup(mock_app, sample_clippings):
+    """Test that duplicate filtering checks all hashes with a single DAO call."""
+    app, _, _, dao_mock = mock_app
+    duplicate = sample_clippings[0]
+    dao_mock.existing_hashes.return_value = {
+        generate_highlight_hash(duplicate.title, duplicate.author, duplicate.content)
+    }
+
+    stats = ExportStats()
+
+    new_clippings = list(Kindle2Readwise._filter_duplicates(app, iter(sample_clippings), stats))
+
+    assert stats.total_processed == TOTAL_CLIPPINGS
+    assert stats.duplicates_skipped == ONE_CLIPPING
+    assert new_clippings == sample_clippings[1:]
+    dao_mock.existing_hashes.assert_called_once()
+    dao_mock.highlight_exists.assert_not_called()
+
+
+def test_pending_and_selected_share_one_parse(mock_app, tmp_path):
+    """Test that the interactive flow parses an unchanged clippings file only once."""
+    app, parser_mock, _, dao_mock = mock_app
+    clippings_file = tmp_path / "My Clippings.txt"
+    clippings_file.write_text("placeholder", encoding="utf-8")
+    app.clippings_file = clippings_file
+    dao_mock.existing_hashes.return_value = set()
+
+    pending = app.get_pending_highlights()
+    stats = app.process_selected([h["id"] for h in pending])
+
+    parser_mock.parse.assert_called_once()
+    assert dao_mock.existing_hashes.call_count == TWO_CLIPPINGS  # One filter pass per call
+    assert stats.total_processed == TOTAL_CLIPPINGS
+    assert stats.duplicates_skipped == CLIPPINGS_DUPE
+
+
+def test_pending_highlight_ids_are_contiguous(mock_app, sample_clippings):
+    """Test that pending IDs index directly into the pending list after duplicates are removed."""
+    app, _, client_mock, dao_mock = mock_app
+    duplicate = sample_clippings[0]
+    dao_mock.existing_hashes.return_value = {
+        generate_highlight_hash(duplicate.title, duplicate.author, duplicate.content)
+    }
+
+    pending = app.get_pending_highlights()
+    assert [h["id"] for h in pending] == [1, 2]
+
+    app.process_selected([2, 99])
+
+    sent_clippings = client_mock.send_highlights_concurrently.call_args[0][0]
+    assert sent_clippings == [sample_clippings[2]]
+
+
+def test_process_saves_only_successfully_sent_highlights(mock_app, sample_clippings):
+    """Test that a failed batch in the middle does not shift which highlights get saved."""
+    app, _, client_mock, dao_mock = mock_app
+    client_mock.send_highlights_concurrently.side_effect = None
+    client_mock.send_highlights_concurrently.return_value = ReadwiseSendResult(
+        sent=2, failed=1, success_mask=[True, False, True]
+    )
+
+    stats = app.process()
+
+    assert stats.new_sent == TWO_CLIPPINGS
+    assert stats.failed_to_send == ONE_CLIPPING
+    assert dao_mock.save_highlights_bulk.call_args[0][0] == [sample_clippings[0], sample_clippings[2]]
+    assert dao_mock.complete_export_session.call_args.kwargs["status"] == "partial"
+
+
+def test_save_falls_back_to_individual_saves_on_integrity_error(mock_app, sample_clippings):
+    """Test that a failing bulk save is retried row by row."""
+    app, _, _, dao_mock = mock_app
+    dao_mock.save_highlights_bulk.side_effect = sqlite3.IntegrityError("constraint failed")
+
+    app._save_exported_highlights(sample_clippings)
+
+    assert dao_mock.try_insert_highlight.call_count == TOTAL_CLIPPINGS
+    dao_mock.save_highlight.assert_not_called()
+
+
+def test_parse_cache_invalidated_when_file_changes(mock_app, tmp_path):
+    """Test that cached parse results are dropped once the clippings file is rewritten."""
+    app, parser_mock, _, _ = mock_app
+    clippings_file = tmp_path / "My Clippings.txt"
+    clippings_file.write_text("placeholder", encoding="utf-8")
+    app.clippings_file = clippings_file
+
+    app._parse_clippings()
+    app._parse_clippings()
+    assert parser_mock.parse.call_count == ONE_CLIPPING
+
+    clippings_file.write_text("placeholder with a new highlight", encoding="utf-8")
+    app._parse_clippings()
+    assert parser_mock.parse.call_count == TWO_CLIPPINGS
+
+
+def test_process_skips_duplicate_checks_when_source_unchanged(mock_app, tmp_path):
+    """Test that an unchanged file and database short-circuit the whole duplicate check."""
+    app, _, client_mock, dao_mock = mock_app
+    clippings_file = tmp_path / "My Clippings.txt"
+    clippings_file.write_text("placeholder", encoding="utf-8")
+    app.clippings_file = clippings_file
+    dao_mock.get_highlights_change_count.return_value = TOTAL_CLIPPINGS
+    dao_mock.last_successful_fingerprint.return_value = app._source_fingerprint()
+
+    stats = app.process()
+
+    assert stats.total_processed == TOTAL_CLIPPINGS
+    assert stats.duplicates_skipped == TOTAL_CLIPPINGS
+    assert stats.new_sent == 0
+    dao_mock.highlight_exists.assert_not_called()
+    client_mock.send_highlights_concurrently.assert_not_called()
+    call_kwargs = dao_mock.complete_export_session.call_args.kwargs
+    assert call_kwargs["source_fingerprint"] == dao_mock.last_successful_fingerprint.return_value
+
+
+def test_unchanged_source_records_same_stats_as_full_check(mock_app, sample_clippings, tmp_path):
+    """Test that the short-circuit counts duplicates like the full duplicate check does."""
+    app, parser_mock, _, dao_mock = mock_app
+    empty = KindleClipping(title="Test Book", author=None, type="bookmark", date=datetime(2025, 4, 15), content="")
+    clippings = [*sample_clippings, empty]
+    parser_mock.iter_parse.side_effect = lambda: iter(clippings)
+    del app._filter_duplicates  # Use the real duplicate filter instead of the fixture's mock
+    dao_mock.existing_hashes.side_effect = set
+    clippings_file = tmp_path / "My Clippings.txt"
+    clippings_file.write_text("placeholder", encoding="utf-8")
+    app.clippings_file = clippings_file
+    dao_mock.get_highlights_change_count.return_value = TOTAL_CLIPPINGS
+
+    dao_mock.last_successful_fingerprint.return_value = None
+    full_check = app.process()
+    dao_mock.last_successful_fingerprint.return_value = app._source_fingerprint()
+    short_circuit = app.process()
+
+    dao_mock.existing_hashes.assert_called_once()
+    assert full_check.total_processed == short_circuit.total_processed == TOTAL_CLIPPINGS + 1
+    assert full_check.duplicates_skipped == short_circuit.duplicates_skipped == TOTAL_CLIPPINGS
+
+
+def test_deleted_highlight_exported_again_after_other_insert(mock_app, tmp_path):
+    """Test that deleting the newest highlight is noticed even if another highlight takes its id."""
+    app, _, client_mock, _ = mock_app
+    del app._filter_duplicates  # Use the real duplicate filter instead of the fixture's mock
+    app.db = HighlightsDAO(tmp_path / "highlights.db")
+    clippings_file = tmp_path / "My Clippings.txt"
+    clippings_file.write_text("placeholder", encoding="utf-8")
+    app.clippings_file = clippings_file
+    app.process()
+    client_mock.send_highlights_concurrently.reset_mock()
+
+    # Delete the highlight with the highest id, then let another file's export reuse that id
+    newest_id = app.db.db.execute("SELECT MAX(id) FROM highlights").fetchone()[0]
+    app.db.delete_highlight(newest_id)
+    other = KindleClipping(
+        title="Other Book", type="highlight", date=datetime(2025, 4, 17), content="Highlight from another file"
+    )
+    app.db.save_highlight(other)
+    assert app.db.db.execute("SELECT MAX(id) FROM highlights").fetchone()[0] == newest_id
+
+    stats = app.process()
+
+    assert stats.new_sent == ONE_CLIPPING
+    assert stats.duplicates_skipped == TOTAL_CLIPPINGS - 1
+    client_mock.send_highlights_concurrently.assert_called_once()
+    app.db.close()
+
+
+def test_filter_duplicates_skips_repeats_within_file(mock_app, sample_clippings):
+    """Test that a clipping repeated in the same file is only passed on once."""
+    app, _, _, dao_mock = mock_app
+    dao_mock.existing_hashes.return_value = set()
+    repeated = sample_clippings[0].model_copy(update={"location": "200-201"})
+    stats = ExportStats()
+
+    new_clippings = list(Kindle2Readwise._filter_duplicates(app, [*sample_clippings, repeated], stats))
+
+    assert new_clippings == sample_clippings
+    assert stats.total_processed == TOTAL_CLIPPINGS + 1
+    assert stats.duplicates_skipped == ONE_CLIPPING
+
+
+def test_fast_dry_run_skips_duplicate_check_and_database(sample_clippings):
+    """Test that a dry run with skip_dedup_check counts every clipping without opening the database."""
+    with patch("kindle2readwise.core.HighlightsDAO") as dao_class, patch("pathlib.Path.exists", return_value=True):
+        app = Kindle2Readwise(
+            clippings_file="test_clippings.txt",
+            readwise_token="test_token",
+            dry_run=True,
+            skip_dedup_check=True,
+        )
+    dao_class.assert_not_called()
+    assert app.db is None
+    app.parser = MagicMock()
+    app.parser.iter_parse.side_effect = lambda: iter(sample_clippings)
+
+    stats = app.process()
+
+    assert stats.total_processed == TOTAL_CLIPPINGS
+    assert stats.new_sent == TOTAL_CLIPPINGS
+    assert stats.duplicates_skipped == CLIPPINGS_DUPE
+    app.close_db()
+
+
+def test_skip_dedup_check_ignored_outside_dry_run():
+    """Test that real exports always check for duplicates."""
+    with patch("kindle2readwise.core.HighlightsDAO") as dao_class, patch("pathlib.Path.exists", return_value=True):
+        app = Kindle2Readwise(clippings_file="test_clippings.txt", readwise_token="test_token", skip_dedup_check=True)
+    dao_class.assert_called_once()
+    assert not app.skip_dedup_check
@@ -79,6 +79,8 @@ def interactive_args():
     args.interactive = True
     args.force = False
     args.dry_run = False
+    args.fast_dry_run = False
+    args.force_validate = False
     args.api_token = "test_token"
     args.file = "My Clippings.txt"
     args.db_path = None
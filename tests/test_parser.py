@@ -4,8 +4,10 @@ import datetime
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
-from kindle2readwise.parser import KindleClippingsParser
+from kindle2readwise.parser import KindleClipping, KindleClippingsParser
+from kindle2readwise.utils.hashing import generate_highlight_hash
 
 
 @pytest.fixture
@@ -141,3 +143,18 @@ def test_clipping_to_readwise_format(sample_clippings_path):
     assert location_only_format["author"] == "Ray Bradbury"
     assert location_only_format["location"] == "784-785"  # Using location
     assert location_only_format["location_type"] == "location"  # Type should be location
+
+
+def test_clipping_hash_follows_content():
+    """Test that the cached hash cannot go stale through assignment or copies."""
+    clipping = KindleClipping(
+        title="Test Book", type="highlight", date=datetime.datetime(2025, 4, 15), content="Original"
+    )
+    original_hash = clipping.hash
+
+    with pytest.raises(ValidationError):
+        clipping.content = "Changed"
+
+    copied = clipping.model_copy(update={"content": "Changed"})
+    assert copied.hash == generate_highlight_hash("Test Book", None, "Changed")
+    assert clipping.hash == original_hash
@@ -1,6 +1,7 @@
 """Tests for the Readwise API client."""
 
 import json
+import time
 from datetime import datetime
 from unittest.mock import patch
 
@@ -10,6 +11,13 @@ import responses
 from kindle2readwise.parser import KindleClipping
 from kindle2readwise.readwise import ReadwiseAPIClient
 
+TOKEN_CACHE_EXPIRED = ReadwiseAPIClient.TOKEN_CACHE_TTL + 1
+VALIDATION_REQUESTS_WITHOUT_CACHE = 4
+HIGHLIGHTS_URL = "https://readwise.io/api/v2/highlights/"
+RETRY_AFTER_SECONDS = 2.0
+THREE_BATCHES = 3
+TWO_SLEEPS = 2
+
 
 @pytest.fixture
 def sample_clipping():
@@ -54,6 +62,58 @@ def test_validate_token_exception(api_client):
     assert api_client.validate_token() is False
 
 
+@pytest.fixture
+def cached_api_client(tmp_path):
+    """Fixture providing a Readwise API client that caches token validations."""
+    return ReadwiseAPIClient("test_token", token_cache_path=tmp_path / "token.json")
+
+
+@responses.activate
+def test_validate_token_uses_recent_cached_validation(cached_api_client):
+    """Test that a recent successful validation is reused without a request."""
+    responses.add(responses.GET, "https://readwise.io/api/v2/auth/", status=204)
+
+    assert cached_api_client.validate_token() is True
+    assert cached_api_client.validate_token() is True
+    # A new client (i.e. a new process) for the same token reuses the cache file as well
+    assert ReadwiseAPIClient("test_token", token_cache_path=cached_api_client.token_cache_path).validate_token()
+
+    assert len(responses.calls) == 1
+    assert "test_token" not in cached_api_client.token_cache_path.read_text(encoding="utf-8")
+
+
+@responses.activate
+def test_validate_token_cache_bypassed(cached_api_client):
+    """Test that forced validations, other tokens and expired entries ask Readwise again."""
+    responses.add(responses.GET, "https://readwise.io/api/v2/auth/", status=204)
+    assert cached_api_client.validate_token() is True
+
+    assert cached_api_client.validate_token(force=True) is True
+    assert ReadwiseAPIClient("other_token", token_cache_path=cached_api_client.token_cache_path).validate_token()
+    with patch("kindle2readwise.readwise.client.time.time", return_value=time.time() + TOKEN_CACHE_EXPIRED):
+        assert cached_api_client.validate_token() is True
+
+    assert len(responses.calls) == VALIDATION_REQUESTS_WITHOUT_CACHE
+
+
+@responses.activate
+def test_validate_token_failure_not_cached(cached_api_client):
+    """Test that a failed validation is not remembered."""
+    responses.add(responses.GET, "https://readwise.io/api/v2/auth/", status=401)
+
+    assert cached_api_client.validate_token() is False
+    assert not cached_api_client.token_cache_path.exists()
+
+
+def test_validate_token_ignores_corrupt_cache(cached_api_client):
+    """Test that an unreadable cache file falls back to asking Readwise."""
+    cached_api_client.token_cache_path.write_text("not json", encoding="utf-8")
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, "https://readwise.io/api/v2/auth/", status=204)
+        assert cached_api_client.validate_token() is True
+
+
 @responses.activate
 def test_send_highlights_success(api_client, sample_clipping):
     """Test sending highlights with successful response."""
@@ -155,3 +215,92 @@ def test_send_highlights_batching(mock_sleep, api_client):
 
     # Verify that sleep was called between batches
     mock_sleep.assert_called_once_with(api_client.REQUEST_DELAY)
+
+
+@responses.activate
+def test_send_highlights_concurrently_reports_per_clipping_success(api_client):
+    """Test that a failed batch only marks its own clippings as unsent."""
+    batch_size = 2
+    api_client.MAX_BATCH_SIZE = batch_size
+    clippings = [
+        KindleClipping(
+            title=f"Test Book {i}",
+            author="Test Author",
+            type="highlight",
+            location=f"{i + 1}",
+            date=datetime(2025, 4, 15, 22, 16, 21),
+            content=f"This is test highlight {i}",
+        )
+        for i in range(5)
+    ]
+
+    def reject_middle_batch(request):
+        titles = {h["title"] for h in json.loads(request.body)["highlights"]}
+        if "Test Book 2" in titles:
+            return (500, {}, json.dumps({"error": "Server error"}))
+        return (200, {}, json.dumps({"highlights": []}))
+
+    responses.add_callback(responses.POST, "https://readwise.io/api/v2/highlights/", callback=reject_middle_batch)
+
+    result = api_client.send_highlights_concurrently(clippings)
+
+    assert result.sent == len(clippings) - batch_size
+    assert result.failed == batch_size
+    assert result.success_mask == [True, True, False, False, True]
+
+
+@patch("kindle2readwise.readwise.client.time.sleep", return_value=None)
+@responses.activate
+def test_send_batch_retries_after_rate_limit(mock_sleep, api_client, sample_clipping):
+    """Test that a batch rejected with HTTP 429 is retried after the Retry-After delay."""
+    responses.add(responses.POST, HIGHLIGHTS_URL, status=429, headers={"Retry-After": "2"})
+    responses.add(responses.POST, HIGHLIGHTS_URL, json={}, status=200)
+
+    result = api_client.send_highlights_concurrently([sample_clipping])
+
+    assert result.sent == 1
+    assert result.success_mask == [True]
+    mock_sleep.assert_any_call(RETRY_AFTER_SECONDS)
+
+
+@patch("kindle2readwise.readwise.client.time.sleep", return_value=None)
+@responses.activate
+def test_send_batch_gives_up_after_max_retries(mock_sleep, api_client, sample_clipping):
+    """Test that a batch still rate limited after all retries is reported as failed."""
+    responses.add(responses.POST, HIGHLIGHTS_URL, status=429)
+
+    result = api_client.send_highlights_concurrently([sample_clipping])
+
+    assert result.failed == 1
+    assert len(responses.calls) == api_client.MAX_RETRIES + 1
+    backoff = [c.args[0] for c in mock_sleep.call_args_list]
+    assert backoff == [api_client.DEFAULT_RETRY_AFTER * 2**i for i in range(api_client.MAX_RETRIES)]
+
+
+@patch("kindle2readwise.readwise.client.time.sleep", return_value=None)
+@responses.activate
+def test_send_highlights_concurrently_paces_rounds(mock_sleep, api_client, sample_clipping):
+    """Test that consecutive rounds of batches are spaced by REQUEST_DELAY per batch."""
+    api_client.MAX_BATCH_SIZE = 1
+    api_client.MAX_CONCURRENT_REQUESTS = 2
+    responses.add(responses.POST, HIGHLIGHTS_URL, json={}, status=200)
+
+    # Three batches: a round of two, then a round of one
+    result = api_client.send_highlights_concurrently([sample_clipping] * 3)
+    assert result.sent == THREE_BATCHES
+    assert mock_sleep.call_count == 1
+    assert 0 < mock_sleep.call_args.args[0] <= api_client.REQUEST_DELAY * 2
+
+    # The next call (e.g. the next export chunk) waits for the last round's share as well
+    api_client.send_highlights_concurrently([sample_clipping])
+    assert mock_sleep.call_count == TWO_SLEEPS
+    assert 0 < mock_sleep.call_args.args[0] <= api_client.REQUEST_DELAY
+
+
+def test_send_highlights_concurrently_empty(api_client):
+    """Test sending an empty list concurrently."""
+    result = api_client.send_highlights_concurrently([])
+
+    assert result.sent == 0
+    assert result.failed == 0
+    assert result.success_mask == []